@@ -0,0 +1,150 @@
+import threading
+from functools import wraps
+
+from flask import jsonify, request
+
+
+class PoolSaturated(Exception):
+    def __init__(self, pool, retry_after):
+        super().__init__(f"{pool} is saturated")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class ConcurrencyPool:
+    """At most `max_concurrent` requests run at once; up to `max_queue` more may wait."""
+
+    def __init__(self, name, max_concurrent, max_queue=0, wait_timeout=5.0, retry_after=5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.users = 0  # requests holding a reference; quota pools are dropped at zero
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated(self.name, self.retry_after)
+            self.waiting += 1
+            try:
+                acquired = self.condition.wait_for(lambda: self.active < self.max_concurrent, self.wait_timeout)
+            finally:
+                self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+                raise PoolSaturated(self.name, self.retry_after)
+            self.active += 1
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'rejected': self.rejected,
+            }
+
+
+class AdmissionController:
+    def __init__(self):
+        self.pools = {}
+        self.quota_settings = {}  # pool name -> (max_concurrent, max_queue, retry_after) for each key
+        self.quota_pools = {}  # (pool name, key) -> ConcurrencyPool, only while in use
+        self.quota_rejected = {}  # pool name -> requests turned away by a per-key quota
+        self.lock = threading.Lock()
+
+    def add_pool(self, name, max_concurrent, max_queue=0, wait_timeout=5.0, retry_after=5):
+        self.pools[name] = ConcurrencyPool(name, max_concurrent, max_queue, wait_timeout, retry_after)
+
+    def add_quota(self, name, max_concurrent, max_queue=0, retry_after=None):
+        # Per-key limit (e.g. per company) applied inside the shared pool `name`;
+        # rejections use the shared pool's Retry-After unless one is given
+        if retry_after is None:
+            retry_after = self.pools[name].retry_after
+        self.quota_settings[name] = (max_concurrent, max_queue, retry_after)
+
+    def _checkout_quota(self, name, key):
+        with self.lock:
+            pool = self.quota_pools.get((name, key))
+            if pool is None:
+                max_concurrent, max_queue, retry_after = self.quota_settings[name]
+                pool = ConcurrencyPool(name, max_concurrent, max_queue, wait_timeout=0, retry_after=retry_after)
+                self.quota_pools[(name, key)] = pool
+            pool.users += 1
+            return pool
+
+    def _checkin_quota(self, name, key, pool):
+        # Forget idle keys so one-off callers (e.g. anonymous IPs) don't accumulate
+        with self.lock:
+            pool.users -= 1
+            if pool.users == 0:
+                del self.quota_pools[(name, key)]
+
+    def limit(self, name, key_func=None, methods=None):
+        """Decorator for a view: run it inside pool `name`, or answer 503 when saturated."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if methods and request.method not in methods:
+                    return view(*args, **kwargs)
+                acquired = []
+                quota = None
+                try:
+                    if key_func and name in self.quota_settings:
+                        key = key_func()
+                        quota = self._checkout_quota(name, key)
+                        try:
+                            quota.acquire()
+                        except PoolSaturated:
+                            with self.lock:
+                                self.quota_rejected[name] = self.quota_rejected.get(name, 0) + 1
+                            raise
+                        acquired.append(quota)
+                    pool = self.pools[name]
+                    pool.acquire()
+                    acquired.append(pool)
+                    return view(*args, **kwargs)
+                except PoolSaturated as e:
+                    response = jsonify({'error': 'Server busy, please retry shortly', 'pool': e.pool})
+                    response.status_code = 503
+                    response.headers['Retry-After'] = str(e.retry_after)
+                    return response
+                finally:
+                    for pool in reversed(acquired):
+                        pool.release()
+                    if quota is not None:
+                        self._checkin_quota(name, key, quota)
+            return wrapped
+        return decorator
+
+    def stats(self):
+        # Quotas are aggregated per pool so no user ids or addresses are exposed
+        with self.lock:
+            quotas = {name: {'keys': 0, 'active': 0, 'waiting': 0, 'rejected': self.quota_rejected.get(name, 0)}
+                      for name in self.quota_settings}
+            for (name, _), pool in self.quota_pools.items():
+                quotas[name]['keys'] += 1
+                quotas[name]['active'] += pool.active
+                quotas[name]['waiting'] += pool.waiting
+        return {
+            'pools': {name: pool.stats() for name, pool in self.pools.items()},
+            'quotas': quotas,
+        }
+
+
+admission = AdmissionController()
@@ -4,22 +4,57 @@ from flask import Flask, render_template, url_for, redirect, request, flash, ses
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin, LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from flask import jsonify 
+from datetime import datetime, timedelta
+from flask import jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from resume_screening import screen_resumes_from_list
+from resume_screening import screen_resumes_from_list, extract_text, MAX_PDF_PAGES, MAX_RESUME_CHARS
+from near_duplicates import DUPLICATE_THRESHOLD
+from job_recommender import job_index
+from live_updates import broker
+from chunked_uploads import append_chunk, finish_upload, discard_upload, upload_lock, remove_lock_file, ChunkError, UploadBusy, MAX_CHUNK_SIZE
+import uuid
+from applicant_export import csv_lines, ndjson_lines, encode, gzip_chunks
+from admission import admission
+from resume_vectors import ResumeVectorIndex
 import time
 import random
+import click
+from itertools import chain, islice
 # Create and configure the Flask application
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'  # Needed for session management and security
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'  # Path to our SQLite database file
+app.config['SQLALCHEMY_BINDS'] = {'archive': 'sqlite:///archive.db'}  # Old applications are moved here
 db = SQLAlchemy(app)  # Initialize the database
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['PROJECT_UPLOAD_MAX_SIZE'] = 2 * 1024 * 1024 * 1024  # 2GB per file for chunked project uploads
+app.config['PROJECT_UPLOAD_EXPIRY_HOURS'] = 48  # unfinished uploads older than this are purged
+app.config['RESUME_MAX_PDF_PAGES'] = MAX_PDF_PAGES  # stop extracting a resume after this many pages
+app.config['RESUME_MAX_CHARS'] = MAX_RESUME_CHARS  # ...or after this many characters
+app.config['RESUME_DUPLICATE_THRESHOLD'] = DUPLICATE_THRESHOLD  # Jaccard similarity at which resumes are treated as copies
+# Archive policy: only finished applications are archived, once they are older than
+# ARCHIVE_FINAL_STATUS_AGE_DAYS or their job is older than ARCHIVE_JOB_AGE_DAYS
+app.config['ARCHIVE_JOB_AGE_DAYS'] = 365
+app.config['ARCHIVE_FINAL_STATUSES'] = ['Rejected', 'Hired']
+app.config['ARCHIVE_FINAL_STATUS_AGE_DAYS'] = 90
+app.config['ARCHIVE_BATCH_SIZE'] = 500
+app.config['ARCHIVE_UPLOAD_GRACE_HOURS'] = 48  # unfinished project uploads younger than this hold back archiving
 
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+# Concurrency limits for CPU-heavy routes so they can't starve cheap ones
+admission.add_pool('screening', max_concurrent=2, max_queue=4, wait_timeout=10, retry_after=15)
+admission.add_quota('screening', max_concurrent=1)  # per company
+admission.add_pool('auth', max_concurrent=8, max_queue=16, wait_timeout=2, retry_after=2)
+
+def admission_key():
+    # Companies get their own screening quota; anonymous callers are keyed by address
+    if current_user.is_authenticated:
+        return current_user.get_id()
+    return request.remote_addr
+
 # Set up Flask-Login for user session management
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -72,6 +107,29 @@ class ProjectSubmission(db.Model):
     
     application = db.relationship('Application', backref='project_submissions')
     project_template = db.relationship('ProjectTemplate', backref='submissions')
+    files = db.relationship('ProjectSubmissionFile', backref='submission', lazy=True)
+
+# One uploaded deliverable of a project submission
+class ProjectSubmissionFile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    submission_id = db.Column(db.Integer, db.ForeignKey('project_submission.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# A resumable chunked upload that is still in progress
+class ProjectUpload(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid hex, used as the upload token
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    project_template_id = db.Column(db.Integer, db.ForeignKey('project_template.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.Integer, nullable=False)
+    received = db.Column(db.Integer, default=0)  # bytes written to disk so far
+    temp_path = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), default='uploading')  # uploading, complete
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Company(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -137,9 +195,106 @@ class Application(db.Model):
     def __repr__(self):
         return f"Application('{self.candidate_id}', '{self.job_id}', '{self.status}')"
 
+# Skills and resume text used for job recommendations
+class CandidateProfile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), unique=True, nullable=False)
+    skills = db.Column(db.Text)  # comma separated
+    resume_text = db.Column(db.Text)  # text extracted from the latest uploaded resume
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    candidate = db.relationship('Candidate', backref=db.backref('profile', uselist=False))
+
+    def __repr__(self):
+        return f"CandidateProfile('{self.candidate_id}')"
+
+# Archive copies of old applications, stored in the separate 'archive' database.
+# Primary keys are kept so archiving a batch twice is harmless.
+class ArchivedApplication(db.Model):
+    __bind_key__ = 'archive'
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, nullable=False, index=True)
+    job_id = db.Column(db.Integer, nullable=False, index=True)
+    status = db.Column(db.String(50))
+    aptitude_score = db.Column(db.Float)
+    coding_score = db.Column(db.Float)
+    project_score = db.Column(db.Float)
+    date_applied = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"ArchivedApplication('{self.candidate_id}', '{self.job_id}', '{self.status}')"
+
+class ArchivedAssessment(db.Model):
+    __bind_key__ = 'archive'
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, nullable=False, index=True)
+    resume_score = db.Column(db.Float)
+    aptitude_score = db.Column(db.Float)
+    coding_score = db.Column(db.Float)
+    video_score = db.Column(db.Float)
+    current_round = db.Column(db.String(50))
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+
+class ArchivedProjectSubmission(db.Model):
+    __bind_key__ = 'archive'
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, nullable=False, index=True)
+    project_template_id = db.Column(db.Integer, nullable=False)
+    submission_text = db.Column(db.Text)
+    submission_url = db.Column(db.String(500))
+    file_path = db.Column(db.String(500))
+    submitted_at = db.Column(db.DateTime)
+    score = db.Column(db.Float)
+    feedback = db.Column(db.Text)
+    status = db.Column(db.String(20))
+
+class ArchivedProjectSubmissionFile(db.Model):
+    __bind_key__ = 'archive'
+    id = db.Column(db.Integer, primary_key=True)
+    submission_id = db.Column(db.Integer, nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    uploaded_at = db.Column(db.DateTime)
+
 # Create all database tables within the application context
 with app.app_context():
     db.create_all()
+    # Build the recommendation index once; post_job keeps it up to date afterwards
+    job_index.load(Job.query.all())
+
+# Hashed term vectors of every submitted resume, keyed by application id
+resume_index = ResumeVectorIndex(os.path.join(app.instance_path, 'resume_index'))
+
+def get_or_create_profile(candidate_id):
+    profile = CandidateProfile.query.filter_by(candidate_id=candidate_id).first()
+    if not profile:
+        profile = CandidateProfile(candidate_id=candidate_id)
+        db.session.add(profile)
+    return profile
+
+def profile_skills(user):
+    # Skills are stored on CandidateProfile; Candidate itself has no skills column
+    profile = getattr(user, 'profile', None)
+    if not profile or not profile.skills:
+        return []
+    return [skill.strip() for skill in profile.skills.split(',') if skill.strip()]
+
+def recommend_jobs_for(candidate, limit=5):
+    profile = candidate.profile
+    if not profile:
+        return []
+    text = " ".join(filter(None, [profile.skills, profile.resume_text]))
+    applied = [application.job_id for application in candidate.applications]
+    ranked = job_index.recommend(text, limit=limit, exclude=applied)
+    if not ranked:
+        return []
+    # Primary key lookup for just the top N jobs
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in ranked])).all()}
+    return [(jobs[job_id], score) for job_id, score in ranked if job_id in jobs]
 
 # This callback is used to reload the user object from the user ID stored in the session
 @login_manager.user_loader
@@ -188,6 +343,13 @@ def debug_user_info():
     
     print("================================")
 
+def find_existing_application(candidate_id, job_id):
+    # Archived applications count too, so a candidate can't apply twice to the same job
+    application = Application.query.filter_by(candidate_id=candidate_id, job_id=job_id).first()
+    if application:
+        return application
+    return ArchivedApplication.query.filter_by(candidate_id=candidate_id, job_id=job_id).first()
+
 # Define Routes (Views)
 
 @app.route('/')
@@ -195,6 +357,7 @@ def home():
     return render_template('home.html')
 
 @app.route('/login', methods=['GET', 'POST'])
+@admission.limit('auth', methods=['POST'])
 def login():
     if request.method == 'POST':
         user_type = request.form.get('user_type')
@@ -242,6 +405,7 @@ def logout():
     return redirect(url_for('home'))
 
 @app.route('/register/candidate', methods=['GET', 'POST'])
+@admission.limit('auth', methods=['POST'])
 def register_candidate():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -276,6 +440,7 @@ def register_candidate():
     return render_template('register_candidate.html')
 
 @app.route('/register/company', methods=['GET', 'POST'])
+@admission.limit('auth', methods=['POST'])
 def register_company():
     if request.method == 'POST':
         company_name = request.form.get('company_name')
@@ -317,7 +482,26 @@ def candidate_dashboard():
         flash('Access denied. Please login as a candidate.', 'error')
         return redirect(url_for('login'))
     
-    return render_template('candidate_dashboard.html', user=current_user)
+    recommendations = recommend_jobs_for(current_user)
+    
+    return render_template('candidate_dashboard.html', user=current_user, recommendations=recommendations)
+
+@app.route('/api/candidate/recommendations')
+@login_required
+def candidate_recommendations_api():
+    if not isinstance(current_user, Candidate):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    limit = min(request.args.get('limit', 5, type=int), 50)
+    recommendations = [{
+        'job_id': job.id,
+        'title': job.title,
+        'company': job.employer.company_name,
+        'role_type': job.role_type,
+        'score': score
+    } for job, score in recommend_jobs_for(current_user, limit=limit)]
+    
+    return jsonify({'recommendations': recommendations})
 
 @app.route('/dashboard/company')
 @login_required
@@ -337,10 +521,19 @@ def company_dashboard():
     ten_minutes_ago = datetime.utcnow() - timedelta(minutes=10)
     current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
     
+    # Starting values for the stat counters; the live event stream keeps them current
+    company_applications = Application.query.join(Job, Job.id == Application.job_id).filter(Job.company_id == current_user.id)
+    total_applications = company_applications.count()
+    pending_applications = company_applications.filter(Application.status == 'Applied').count()
+    hired_count = company_applications.filter(Application.status == 'Hired').count()
+    
     return render_template('company_dashboard.html', 
                          user=current_user, 
                          current_time=current_time,
-                         ten_minutes_ago=ten_minutes_ago)
+                         ten_minutes_ago=ten_minutes_ago,
+                         total_applications=total_applications,
+                         pending_applications=pending_applications,
+                         hired_count=hired_count)
 @app.route('/post-job', methods=['GET', 'POST'])
 @login_required
 def post_job():
@@ -372,6 +565,7 @@ def post_job():
         try:
             db.session.add(new_job)
             db.session.commit()
+            job_index.add_job(new_job)
             flash('Job posted successfully!', 'success')
             return redirect(url_for('company_dashboard'))
         except Exception as e:
@@ -450,10 +644,7 @@ def apply_job(job_id):
     job = Job.query.get_or_404(job_id)
     
     # Check if already applied
-    existing_application = Application.query.filter_by(
-        candidate_id=current_user.id,
-        job_id=job_id
-    ).first()
+    existing_application = find_existing_application(current_user.id, job_id)
     
     if existing_application:
         flash('You have already applied for this position.', 'info')
@@ -473,10 +664,7 @@ def submit_application(job_id):
         return redirect(url_for('login'))
     
     # Check if already applied
-    existing_application = Application.query.filter_by(
-        candidate_id=current_user.id,
-        job_id=job_id
-    ).first()
+    existing_application = find_existing_application(current_user.id, job_id)
     
     if existing_application:
         flash('You have already applied for this position.', 'info')
@@ -484,6 +672,7 @@ def submit_application(job_id):
     
     # Handle file upload if present
     resume_filename = None
+    resume_text = None
     if 'resume' in request.files:
         resume_file = request.files['resume']
         if resume_file and resume_file.filename != '':
@@ -500,6 +689,16 @@ def submit_application(job_id):
             filename = secure_filename(resume_file.filename)
             unique_filename = f"{uuid.uuid4().hex}_{filename}"
             resume_path = os.path.join(upload_folder, unique_filename)
+            
+            # Keep the resume text for job recommendations
+            try:
+                resume_text = extract_text(resume_file, app.config['RESUME_MAX_PDF_PAGES'], app.config['RESUME_MAX_CHARS'])
+                if resume_text:
+                    get_or_create_profile(current_user.id).resume_text = resume_text
+            except Exception as e:
+                print(f"Could not extract resume text: {e}")
+            resume_file.stream.seek(0)
+            
             resume_file.save(resume_path)
             resume_filename = unique_filename
     
@@ -522,6 +721,21 @@ def submit_application(job_id):
         db.session.add(new_assessment)
         db.session.commit()
         
+        # Make the resume searchable for future job postings
+        if resume_text:
+            resume_index.add(new_application.id, current_user.id, resume_text)
+        
+        # Push the new application to any open company dashboards
+        job = new_application.position
+        broker.publish(job.company_id, 'application', {
+            'application_id': new_application.id,
+            'job_id': job.id,
+            'job_title': job.title,
+            'candidate_name': current_user.username,
+            'date_applied': new_application.date_applied.strftime('%Y-%m-%d %H:%M'),
+            'status': new_application.status
+        })
+        
         flash('Application submitted successfully!', 'success')
         return redirect(url_for('assessment', application_id=new_application.id))
     except Exception as e:
@@ -529,6 +743,145 @@ def submit_application(job_id):
         flash('An error occurred while submitting your application.', 'error')
         print(f"Error: {e}")
         return redirect(url_for('view_job', job_id=job_id))# Placeholder routes for future implementation
+# Moving old applications from the hot tables into the archive database
+def copy_to_archive(row, archive_model):
+    values = {column.name: getattr(row, column.name) for column in row.__table__.columns}
+    db.session.merge(archive_model(**values))
+
+def archivable_application_ids(limit):
+    now = datetime.utcnow()
+    job_cutoff = now - timedelta(days=app.config['ARCHIVE_JOB_AGE_DAYS'])
+    final_cutoff = now - timedelta(days=app.config['ARCHIVE_FINAL_STATUS_AGE_DAYS'])
+    upload_cutoff = now - timedelta(hours=app.config['ARCHIVE_UPLOAD_GRACE_HOURS'])
+    # Leave applications alone while a recent project upload is still in progress;
+    # older unfinished uploads are treated as abandoned and removed by archive_batch
+    uploading = db.session.query(ProjectUpload.id).filter(
+        ProjectUpload.application_id == Application.id,
+        ProjectUpload.status == 'uploading',
+        ProjectUpload.created_at >= upload_cutoff
+    ).exists()
+    # Applications still in the pipeline stay hot however old their job is
+    rows = db.session.query(Application.id).join(Job, Job.id == Application.job_id).filter(
+        Application.status.in_(app.config['ARCHIVE_FINAL_STATUSES']),
+        db.or_(Job.date_posted < job_cutoff, Application.date_applied < final_cutoff),
+        ~uploading
+    ).order_by(Application.id).limit(limit).all()
+    return [row.id for row in rows]
+
+def archive_batch(application_ids):
+    # Abandoned uploads: remove their partial files, not just the rows
+    stale_uploads = ProjectUpload.query.filter(
+        ProjectUpload.application_id.in_(application_ids),
+        ProjectUpload.status == 'uploading'
+    ).all()
+    busy = {upload.application_id for upload in stale_uploads if not delete_upload(upload)}
+    application_ids = [application_id for application_id in application_ids if application_id not in busy]
+    if not application_ids:
+        return []
+    
+    submissions = ProjectSubmission.query.filter(ProjectSubmission.application_id.in_(application_ids)).all()
+    submission_ids = [submission.id for submission in submissions]
+    submission_files = ProjectSubmissionFile.query.filter(ProjectSubmissionFile.submission_id.in_(submission_ids)).all() if submission_ids else []
+    
+    # Write the archive copies first; if we stop before the deletes, the next run merges them again
+    for application in Application.query.filter(Application.id.in_(application_ids)).all():
+        copy_to_archive(application, ArchivedApplication)
+    for assessment in Assessment.query.filter(Assessment.application_id.in_(application_ids)).all():
+        copy_to_archive(assessment, ArchivedAssessment)
+    for submission in submissions:
+        copy_to_archive(submission, ArchivedProjectSubmission)
+    for submission_file in submission_files:
+        copy_to_archive(submission_file, ArchivedProjectSubmissionFile)
+    db.session.commit()
+    
+    if submission_ids:
+        ProjectSubmissionFile.query.filter(ProjectSubmissionFile.submission_id.in_(submission_ids)).delete(synchronize_session=False)
+    ProjectUpload.query.filter(ProjectUpload.application_id.in_(application_ids)).delete(synchronize_session=False)
+    ProjectSubmission.query.filter(ProjectSubmission.application_id.in_(application_ids)).delete(synchronize_session=False)
+    Assessment.query.filter(Assessment.application_id.in_(application_ids)).delete(synchronize_session=False)
+    Application.query.filter(Application.id.in_(application_ids)).delete(synchronize_session=False)
+    db.session.commit()
+    db.session.expunge_all()
+    resume_index.remove(application_ids)
+    return application_ids
+
+def archive_applications(batch_size=None, max_batches=None):
+    # Safe to stop and re-run at any point: every batch picks up the oldest remaining ids
+    batch_size = batch_size or app.config['ARCHIVE_BATCH_SIZE']
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        application_ids = archivable_application_ids(batch_size)
+        if not application_ids:
+            break
+        try:
+            archived = archive_batch(application_ids)
+        except Exception:
+            db.session.rollback()
+            raise
+        if not archived:
+            # Everything left is busy with an upload right now; try again on the next run
+            break
+        moved += len(archived)
+        batches += 1
+    return moved
+
+@app.cli.command('archive-applications')
+@click.option('--batch-size', type=int, default=None, help='Applications moved per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+def archive_applications_command(batch_size, max_batches):
+    moved = archive_applications(batch_size, max_batches)
+    click.echo(f"Archived {moved} applications")
+
+def archived_export_rows(job_id, chunk_size=1000):
+    # Same columns as the live export; candidates live in the main database so look them up per chunk
+    rows = db.session.query(
+        ArchivedApplication.id,
+        ArchivedApplication.candidate_id,
+        ArchivedApplication.status,
+        ArchivedAssessment.current_round,
+        ArchivedAssessment.resume_score,
+        ArchivedAssessment.aptitude_score,
+        ArchivedAssessment.coding_score,
+        ArchivedAssessment.video_score,
+        ArchivedApplication.project_score,
+        ArchivedApplication.date_applied
+    ).outerjoin(ArchivedAssessment, ArchivedAssessment.application_id == ArchivedApplication.id
+    ).filter(ArchivedApplication.job_id == job_id
+    ).order_by(ArchivedApplication.id
+    ).execution_options(stream_results=True
+    ).yield_per(chunk_size)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        candidate_ids = {row.candidate_id for row in chunk}
+        candidates = {c.id: (c.username, c.email) for c in db.session.query(Candidate.id, Candidate.username, Candidate.email).filter(Candidate.id.in_(candidate_ids))}
+        for row in chunk:
+            username, email = candidates.get(row.candidate_id, (None, None))
+            yield (row.id, username, email) + tuple(row[2:])
+
+@app.route('/api/candidate/applications')
+@login_required
+def candidate_applications_api():
+    if not isinstance(current_user, Candidate):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    applications = Application.query.filter_by(candidate_id=current_user.id).all()
+    # Archived applications are only read when history is asked for
+    if request.args.get('history') in ('1', 'true'):
+        applications += ArchivedApplication.query.filter_by(candidate_id=current_user.id).all()
+    applications.sort(key=lambda a: a.date_applied, reverse=True)
+    
+    return jsonify({'applications': [{
+        'application_id': application.id,
+        'job_id': application.job_id,
+        'status': application.status,
+        'date_applied': application.date_applied.strftime('%Y-%m-%d %H:%M'),
+        'archived': isinstance(application, ArchivedApplication)
+    } for application in applications]})
+
 @app.route('/applications')
 @login_required
 def view_applications():
@@ -560,6 +913,11 @@ def debug_reset_password(email, new_password):
     else:
         return "User not found"
 
+@app.route('/metrics/admission')
+def admission_metrics():
+    # Active/queued request gauges for each admission pool
+    return jsonify(admission.stats())
+
 @app.route('/debug/session')
 def debug_session():
     # Check what's in the session
@@ -586,6 +944,102 @@ def company_jobs():
     jobs = Job.query.filter_by(company_id=current_user.id).order_by(Job.date_posted.desc()).all()
     
     return render_template('company_jobs.html', user=current_user, jobs=jobs)
+@app.route('/company/jobs/<int:job_id>/applications/export')
+@login_required
+def export_applications(job_id):
+    if not isinstance(current_user, Company):
+        flash('Access denied. Please login as a company.', 'error')
+        return redirect(url_for('login'))
+    
+    job = Job.query.get_or_404(job_id)
+    if job.company_id != current_user.id:
+        flash('Access denied.', 'error')
+        return redirect(url_for('company_jobs'))
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    use_gzip = request.args.get('gzip') in ('1', 'true')
+    include_history = request.args.get('history') in ('1', 'true')
+    
+    # Flat tuples straight from the cursor, fetched in batches rather than all at once
+    rows = db.session.query(
+        Application.id,
+        Candidate.username,
+        Candidate.email,
+        Application.status,
+        Assessment.current_round,
+        Assessment.resume_score,
+        Assessment.aptitude_score,
+        Assessment.coding_score,
+        Assessment.video_score,
+        Application.project_score,
+        Application.date_applied
+    ).join(Candidate, Candidate.id == Application.candidate_id
+    ).outerjoin(Assessment, Assessment.application_id == Application.id
+    ).filter(Application.job_id == job_id
+    ).order_by(Application.id
+    ).execution_options(stream_results=True
+    ).yield_per(1000)
+    if include_history:
+        rows = chain(rows, archived_export_rows(job_id))
+    
+    lines = csv_lines(rows) if export_format == 'csv' else ndjson_lines(rows)
+    body = encode(lines)
+    filename = f"job_{job_id}_applications.{export_format}"
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    if use_gzip:
+        body = gzip_chunks(body)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/api/company/jobs/<int:job_id>/matches')
+@login_required
+def job_resume_matches(job_id):
+    if not isinstance(current_user, Company):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    job = Job.query.get_or_404(job_id)
+    if job.company_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    # Approximate top-k over every stored resume, without re-reading any files
+    limit = min(request.args.get('limit', 200, type=int), 1000)
+    job_text = " ".join(filter(None, [job.title, job.description, job.requirements]))
+    for attempt in range(3):
+        # The index returns each candidate's best resume once
+        matches = resume_index.search(job_text, k=limit)
+        ids = [application_id for application_id, _, _ in matches]
+        # One joined query for all matches instead of lazy-loading each applicant
+        rows = db.session.query(
+            Application.id, Application.candidate_id, Application.job_id, Candidate.username
+        ).join(Candidate, Candidate.id == Application.candidate_id
+        ).filter(Application.id.in_(ids)).all() if ids else []
+        applications = {row.id: row for row in rows}
+        missing = [application_id for application_id in ids if application_id not in applications]
+        if not missing:
+            break
+        # Archived or deleted since they were indexed: drop them and search again to refill
+        resume_index.remove(missing)
+    
+    results = []
+    for application_id, _, similarity in matches:
+        application = applications.get(application_id)
+        if application:
+            results.append({
+                'application_id': application.id,
+                'candidate_id': application.candidate_id,
+                'candidate_name': application.username,
+                'applied_for': application.job_id,
+                'similarity': similarity
+            })
+    
+    return jsonify({'job_id': job.id, 'matches': results})
+
 @app.route('/api/company/stats')
 @login_required
 def company_stats_api():
@@ -615,6 +1069,24 @@ def company_stats_api():
     
     return jsonify(stats)
 
+@app.route('/api/company/events')
+@login_required
+def company_events():
+    if not isinstance(current_user, Company):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if broker.is_full(current_user.id):
+        response = jsonify({'error': 'Too many open dashboards for this company'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    
+    # Server-Sent Events stream of new applications for this company
+    response = Response(broker.stream(current_user.id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/assessment')
 @login_required
 def assessment():
@@ -661,11 +1133,227 @@ def project_round(application_id):
     return render_template('project_round.html', application=application)
 
 
+# Resumable chunked uploads for the project round
+PROJECT_UPLOAD_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], 'projects')
+os.makedirs(PROJECT_UPLOAD_FOLDER, exist_ok=True)
+
+def get_own_upload(upload_id):
+    upload = ProjectUpload.query.get_or_404(upload_id)
+    application = Application.query.get(upload.application_id)
+    if not isinstance(current_user, Candidate) or application.candidate_id != current_user.id:
+        return None
+    return upload
+
+@app.route('/api/project-uploads', methods=['POST'])
+@login_required
+def init_project_upload():
+    if not isinstance(current_user, Candidate):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    application = Application.query.get_or_404(data.get('application_id', 0))
+    if application.candidate_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    template = ProjectTemplate.query.get_or_404(data.get('project_template_id', 0))
+    from werkzeug.utils import secure_filename
+    filename = secure_filename(data.get('filename') or '')
+    size = data.get('size')
+    # bool is a subclass of int, so check the exact type
+    if not filename or type(size) is not int or size <= 0:
+        return jsonify({'error': 'filename and size are required'}), 400
+    if size > app.config['PROJECT_UPLOAD_MAX_SIZE']:
+        return jsonify({'error': 'File is too large', 'max_size': app.config['PROJECT_UPLOAD_MAX_SIZE']}), 413
+    
+    upload_id = uuid.uuid4().hex
+    upload = ProjectUpload(
+        id=upload_id,
+        application_id=application.id,
+        project_template_id=template.id,
+        filename=filename,
+        total_size=size,
+        received=0,
+        temp_path=os.path.join(PROJECT_UPLOAD_FOLDER, f"{upload_id}.part")
+    )
+    db.session.add(upload)
+    db.session.commit()
+    
+    return jsonify({'upload_id': upload.id, 'offset': 0, 'chunk_size': MAX_CHUNK_SIZE}), 201
+
+@app.route('/api/project-uploads/<upload_id>', methods=['GET'])
+@login_required
+def project_upload_status(upload_id):
+    upload = get_own_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    # Clients resume from this offset after a dropped connection
+    return jsonify({'upload_id': upload.id, 'offset': upload.received, 'size': upload.total_size, 'status': upload.status})
+
+@app.route('/api/project-uploads/<upload_id>', methods=['PUT'])
+@login_required
+def append_project_upload(upload_id):
+    upload = get_own_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Access denied'}), 403
+    if upload.status != 'uploading':
+        return jsonify({'error': 'Upload already completed'}), 409
+    
+    offset = request.args.get('offset', type=int)
+    
+    # Only one request may append at a time; the offset is re-checked once we hold the lock
+    try:
+        with upload_lock(upload.temp_path):
+            db.session.refresh(upload)
+            if upload.status != 'uploading':
+                return jsonify({'error': 'Upload already completed'}), 409
+            if offset != upload.received:
+                return jsonify({'error': 'Offset mismatch', 'offset': upload.received}), 409
+            
+            # Read the raw body straight to disk instead of letting werkzeug buffer it
+            try:
+                new_offset = append_chunk(upload.id, upload.temp_path, request.stream, offset, upload.total_size)
+            except ChunkError as e:
+                return jsonify({'error': str(e), 'offset': upload.received}), 413
+            
+            updated = ProjectUpload.query.filter_by(id=upload.id, received=offset, status='uploading').update(
+                {'received': new_offset}, synchronize_session=False)
+            db.session.commit()
+            if not updated:
+                discard_upload(upload.id)
+                return jsonify({'error': 'Offset mismatch'}), 409
+    except UploadBusy as e:
+        return jsonify({'error': str(e)}), 409
+    
+    return jsonify({'upload_id': upload.id, 'offset': new_offset})
+
+@app.route('/api/project-uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_project_upload(upload_id):
+    upload = get_own_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    expected = (data.get('sha256') or '').lower()
+    if not expected:
+        return jsonify({'error': 'sha256 of the whole file is required'}), 400
+    
+    try:
+        with upload_lock(upload.temp_path):
+            db.session.refresh(upload)
+            response = finish_project_upload(upload, expected)
+    except UploadBusy as e:
+        return jsonify({'error': str(e)}), 409
+    
+    if upload.status == 'complete':
+        remove_lock_file(upload.temp_path)
+    return response
+
+def finish_project_upload(upload, expected):
+    if upload.status != 'uploading':
+        return jsonify({'error': 'Upload already completed'}), 409
+    if upload.received != upload.total_size:
+        return jsonify({'error': 'Upload incomplete', 'offset': upload.received}), 409
+    
+    checksum = finish_upload(upload.id, upload.temp_path, upload.total_size)
+    if expected != checksum:
+        # Corrupted upload: start over from scratch
+        os.remove(upload.temp_path)
+        upload.received = 0
+        db.session.commit()
+        return jsonify({'error': 'Checksum mismatch', 'offset': 0}), 422
+    
+    # Attach the file to the candidate's submission for this project
+    submission = ProjectSubmission.query.filter_by(
+        application_id=upload.application_id,
+        project_template_id=upload.project_template_id
+    ).first()
+    if not submission:
+        submission = ProjectSubmission(
+            application_id=upload.application_id,
+            project_template_id=upload.project_template_id
+        )
+        db.session.add(submission)
+        db.session.flush()
+    
+    final_path = os.path.join(PROJECT_UPLOAD_FOLDER, f"{upload.id}_{upload.filename}")
+    os.replace(upload.temp_path, final_path)
+    submission_file = ProjectSubmissionFile(
+        submission_id=submission.id,
+        filename=upload.filename,
+        file_path=final_path,
+        size=upload.total_size,
+        sha256=checksum
+    )
+    db.session.add(submission_file)
+    if not submission.file_path:
+        submission.file_path = final_path
+    upload.status = 'complete'
+    
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        os.replace(final_path, upload.temp_path)
+        print(f"Error: {e}")
+        return jsonify({'error': 'Could not save the upload'}), 500
+    
+    return jsonify({
+        'file_id': submission_file.id,
+        'submission_id': submission.id,
+        'filename': submission_file.filename,
+        'size': submission_file.size,
+        'sha256': checksum
+    })
+
+@app.route('/api/project-uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def cancel_project_upload(upload_id):
+    upload = get_own_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Access denied'}), 403
+    if upload.status != 'uploading':
+        return jsonify({'error': 'Upload already completed'}), 409
+    
+    if not delete_upload(upload):
+        return jsonify({'error': 'Another request is writing to this upload'}), 409
+    return jsonify({'upload_id': upload_id, 'status': 'cancelled'})
+
+def delete_upload(upload):
+    # Drop an unfinished upload's row, partial file and lock file; False if a request is writing to it
+    try:
+        with upload_lock(upload.temp_path):
+            discard_upload(upload.id)
+            if os.path.exists(upload.temp_path):
+                os.remove(upload.temp_path)
+            db.session.delete(upload)
+            # Commit while still holding the lock so no append can slip in between
+            db.session.commit()
+    except UploadBusy:
+        return False
+    remove_lock_file(upload.temp_path)
+    return True
+
+def purge_expired_uploads():
+    cutoff = datetime.utcnow() - timedelta(hours=app.config['PROJECT_UPLOAD_EXPIRY_HOURS'])
+    expired = ProjectUpload.query.filter(ProjectUpload.status == 'uploading', ProjectUpload.created_at < cutoff).all()
+    purged = 0
+    for upload in expired:
+        if delete_upload(upload):
+            purged += 1
+    return purged
+
+@app.cli.command('purge-project-uploads')
+def purge_project_uploads_command():
+    purged = purge_expired_uploads()
+    click.echo(f"Purged {purged} expired project uploads")
+
 @app.route('/profile-page')
 @login_required
 def profile_page():
     # Assuming you're using Flask-Login and current_user is available
-    return render_template('profile.html', user=current_user)
+    return render_template('profile.html', user=current_user, skills=profile_skills(current_user))
 
 
 @app.route('/edit-profile', methods=['GET', 'POST'])
@@ -683,6 +1371,10 @@ def edit_profile():
             # Handle skills
             skills = request.form.getlist('skills')
             current_user.skills = skills
+            if isinstance(current_user, Candidate):
+                # Stored comma separated, so commas inside a skill would split it on the next load
+                get_or_create_profile(current_user.id).skills = ", ".join(
+                    skill.replace(',', ' ').strip() for skill in skills if skill.strip())
             
             # Handle experience
             experience = []
@@ -761,7 +1453,7 @@ def edit_profile():
             db.session.rollback()
             flash('Error updating profile: ' + str(e), 'error')
     
-    return render_template('edit_profile.html', user=current_user)
+    return render_template('edit_profile.html', user=current_user, skills=profile_skills(current_user))
 
 
 # Default job description for demo
@@ -771,13 +1463,17 @@ responsive design, UI/UX, and working with APIs.
 """
 
 @app.route("/resume", methods=["GET", "POST"])
+@admission.limit('screening', key_func=admission_key, methods=['POST'])
 def resume_screening():
     if request.method == "POST":
         uploaded_files = request.files.getlist("resumes")
         if not uploaded_files:
             return "❌ Please upload at least one resume"
 
-        best, all_scores = screen_resumes_from_list(JOB_DESC, uploaded_files)
+        best, all_scores = screen_resumes_from_list(JOB_DESC, uploaded_files,
+                                                    duplicate_threshold=app.config['RESUME_DUPLICATE_THRESHOLD'],
+                                                    max_pages=app.config['RESUME_MAX_PDF_PAGES'],
+                                                    max_chars=app.config['RESUME_MAX_CHARS'])
         return render_template("resume.html", best=best, all_scores=all_scores, job_desc=JOB_DESC)
 
     return render_template("resume.html", job_desc=JOB_DESC)
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+import zlib
+
+EXPORT_FIELDS = [
+    'application_id', 'candidate_name', 'candidate_email', 'status', 'current_round',
+    'resume_score', 'aptitude_score', 'coding_score', 'video_score', 'project_score', 'date_applied',
+]
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows):
+    # Write each row into a small reusable buffer so memory stays flat
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([_serialize(value) for value in row])
+        yield buffer.getvalue()
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, (_serialize(value) for value in row)))) + "\n"
+
+
+def encode(lines, batch_size=64 * 1024):
+    # Group small lines into larger writes to keep per-chunk overhead down
+    batch = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        batch.append(data)
+        size += len(data)
+        if size >= batch_size:
+            yield b"".join(batch)
+            batch = []
+            size = 0
+    if batch:
+        yield b"".join(batch)
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
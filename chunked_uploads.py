@@ -0,0 +1,105 @@
+import fcntl
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+# Largest chunk accepted by one append request (well under MAX_CONTENT_LENGTH)
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+# Size of the reads used to copy a chunk from the request body to disk
+COPY_BUFFER_SIZE = 64 * 1024
+
+# upload id -> (offset, running sha256) so complete() doesn't have to re-read the file
+_running_hashes = {}
+_hash_lock = threading.Lock()
+
+
+class ChunkError(Exception):
+    pass
+
+
+class UploadBusy(Exception):
+    pass
+
+
+@contextmanager
+def upload_lock(path):
+    """Hold an exclusive lock on one upload across threads and worker processes."""
+    lock_path = path + '.lock'
+    with open(lock_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadBusy('Another request is writing to this upload')
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def remove_lock_file(path):
+    try:
+        os.remove(path + '.lock')
+    except FileNotFoundError:
+        pass
+
+
+def _hash_file(path, length):
+    # Rebuild the running hash from disk, e.g. after a restart
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(COPY_BUFFER_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _get_hasher(upload_id, path, offset):
+    with _hash_lock:
+        state = _running_hashes.get(upload_id)
+    if state and state[0] == offset:
+        # Work on a copy so a failed request can't corrupt the stored state
+        return state[1].copy()
+    if offset and os.path.exists(path):
+        return _hash_file(path, offset)
+    return hashlib.sha256()
+
+
+def append_chunk(upload_id, path, stream, offset, total_size):
+    """Stream one chunk from `stream` onto the end of `path`; returns the new offset."""
+    hasher = _get_hasher(upload_id, path, offset)
+    written = 0
+    with open(path, 'ab') as f:
+        # Drop any bytes past the acknowledged offset left by an interrupted request
+        f.truncate(offset)
+        f.seek(offset)
+        while True:
+            block = stream.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > MAX_CHUNK_SIZE or offset + written > total_size:
+                f.truncate(offset)
+                raise ChunkError('Chunk is larger than allowed')
+            f.write(block)
+            hasher.update(block)
+    new_offset = offset + written
+    with _hash_lock:
+        _running_hashes[upload_id] = (new_offset, hasher)
+    return new_offset
+
+
+def finish_upload(upload_id, path, size):
+    """Return the sha256 hex digest of the completed file and forget its running state."""
+    hasher = _get_hasher(upload_id, path, size)
+    discard_upload(upload_id)
+    return hasher.hexdigest()
+
+
+def discard_upload(upload_id):
+    with _hash_lock:
+        _running_hashes.pop(upload_id, None)
@@ -0,0 +1,77 @@
+import heapq
+import math
+import re
+import threading
+
+# Words that carry no signal about a job or a candidate
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "our", "that", "the", "to", "we", "with", "you",
+    "your", "will", "have", "has", "looking", "experience", "work", "working",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def normalize_terms(text):
+    # Lowercase, split into tokens and drop stop words / trailing punctuation
+    terms = set()
+    if not text:
+        return terms
+    for token in TOKEN_RE.findall(text.lower()):
+        token = token.rstrip(".")
+        if len(token) > 1 and token not in STOP_WORDS:
+            terms.add(token)
+    return terms
+
+
+def job_terms(job):
+    return normalize_terms(" ".join(filter(None, [job.title, job.role_type, job.description, job.requirements])))
+
+
+class JobIndex:
+    """Inverted index from normalized skill/keyword terms to job ids."""
+
+    def __init__(self):
+        self.postings = {}  # term -> set of job ids
+        self.job_count = 0
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self, jobs):
+        # Build the whole index once; afterwards only add_job() touches it
+        with self.lock:
+            self.postings = {}
+            self.job_count = 0
+            for job in jobs:
+                self._add(job.id, job_terms(job))
+            self.loaded = True
+
+    def add_job(self, job):
+        with self.lock:
+            self._add(job.id, job_terms(job))
+
+    def _add(self, job_id, terms):
+        for term in terms:
+            self.postings.setdefault(term, set()).add(job_id)
+        self.job_count += 1
+
+    def recommend(self, text, limit=5, exclude=()):
+        # Score each job by the summed IDF of the terms it shares with the candidate
+        scores = {}
+        with self.lock:
+            total = self.job_count
+            for term in normalize_terms(text):
+                job_ids = self.postings.get(term)
+                if not job_ids:
+                    continue
+                weight = math.log(1 + total / len(job_ids))
+                for job_id in job_ids:
+                    scores[job_id] = scores.get(job_id, 0.0) + weight
+        for job_id in exclude:
+            scores.pop(job_id, None)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(job_id, round(score, 3)) for job_id, score in top]
+
+
+job_index = JobIndex()
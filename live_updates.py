@@ -0,0 +1,85 @@
+import json
+import queue
+import threading
+import time
+
+# How long a stream waits for an event before sending a keep-alive comment
+HEARTBEAT_SECONDS = 15
+# Events buffered per subscriber before the slowest dashboards start dropping them
+SUBSCRIBER_QUEUE_SIZE = 100
+# Streams are closed after this long so they don't pin a worker forever; EventSource reconnects
+STREAM_LIFETIME_SECONDS = 300
+# Open dashboard streams allowed per company
+MAX_SUBSCRIBERS_PER_COMPANY = 5
+# Reconnect delay sent to clients, in milliseconds
+RETRY_MS = 5000
+
+
+class EventBroker:
+    """In-process pub/sub: one set of subscriber queues per company."""
+
+    def __init__(self):
+        self.subscribers = {}  # company_id -> set of queues
+        self.lock = threading.Lock()
+
+    def subscribe(self, company_id):
+        # Returns None when the company already has as many streams open as allowed
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            company_queues = self.subscribers.setdefault(company_id, set())
+            if len(company_queues) >= MAX_SUBSCRIBERS_PER_COMPANY:
+                return None
+            company_queues.add(q)
+        return q
+
+    def is_full(self, company_id):
+        with self.lock:
+            return len(self.subscribers.get(company_id, ())) >= MAX_SUBSCRIBERS_PER_COMPANY
+
+    def unsubscribe(self, company_id, q):
+        with self.lock:
+            company_queues = self.subscribers.get(company_id)
+            if company_queues:
+                company_queues.discard(q)
+                if not company_queues:
+                    del self.subscribers[company_id]
+
+    def publish(self, company_id, event, data):
+        message = format_sse(event, data)
+        with self.lock:
+            company_queues = list(self.subscribers.get(company_id, ()))
+        for q in company_queues:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # A stalled client should not block the request that published
+                pass
+
+    def stream(self, company_id):
+        # Generator for a streaming response; ends after STREAM_LIFETIME_SECONDS
+        # and unsubscribes when it ends or the client goes away
+        q = self.subscribe(company_id)
+        if q is None:
+            # Lost the race for the last slot: tell the client to come back later
+            yield f"retry: {RETRY_MS * 6}\n\n"
+            return
+        deadline = time.monotonic() + STREAM_LIFETIME_SECONDS
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    yield q.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(company_id, q)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+broker = EventBroker()
@@ -0,0 +1,80 @@
+import zlib
+
+import numpy as np
+
+# Number of hash permutations in a signature; must equal BANDS * ROWS
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = 4
+# Estimated Jaccard similarity at which two resumes count as the same document
+DUPLICATE_THRESHOLD = 0.85
+SHINGLE_SIZE = 3
+
+# Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32 with odd a.
+# Fixed seed so signatures are comparable across processes.
+_rng = np.random.default_rng(1)
+_A = (_rng.integers(0, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_B = _rng.integers(0, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    # Hash each distinct word once, then combine consecutive word hashes into shingle hashes
+    words = text.lower().split()
+    if not words:
+        return None
+    word_hashes = {}
+    ids = np.fromiter((word_hashes.setdefault(w, zlib.crc32(w.encode('utf-8'))) for w in words),
+                      dtype=np.uint64, count=len(words))
+    if len(ids) < size:
+        return np.unique(ids)
+    combined = ids[:len(ids) - size + 1].copy()
+    with np.errstate(over='ignore'):
+        for offset in range(1, size):
+            combined = combined * _SHINGLE_MULTIPLIER + ids[offset:len(ids) - size + 1 + offset]
+    return np.unique(combined)
+
+
+def minhash_signature(text):
+    hashes = shingle_hashes(text)
+    if hashes is None:
+        return None
+    # All permutations at once: (NUM_PERMUTATIONS, shingles) matrix, uint64 arithmetic wraps mod 2**64
+    with np.errstate(over='ignore'):
+        permuted = _A[:, None] * hashes[None, :]
+        permuted += _B[:, None]
+    return tuple((permuted.min(axis=1) >> np.uint64(32)).tolist())
+
+
+def estimate_jaccard(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures."""
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = [{} for _ in range(BANDS)]  # one dict per band: band hash -> keys
+        self.signatures = {}
+
+    def _bands(self, signature):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS]
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for band, rows in self._bands(signature):
+            self.buckets[band].setdefault(rows, []).append(key)
+
+    def query(self, signature):
+        # Return (key, similarity) of the closest indexed signature above the threshold
+        candidates = set()
+        for band, rows in self._bands(signature):
+            candidates.update(self.buckets[band].get(rows, ()))
+        best = None
+        for key in candidates:
+            similarity = estimate_jaccard(signature, self.signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
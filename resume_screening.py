@@ -1,16 +1,69 @@
 import docx2txt
 import pdfplumber
+import time
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
+from pdfplumber.page import Page
 from io import BytesIO
+from near_duplicates import MinHashLSH, minhash_signature, DUPLICATE_THRESHOLD
 
-def extract_text(file):
-    text = ""
+# Default budgets: stop reading a resume once either is reached (None = no limit).
+# The app overrides them through RESUME_MAX_PDF_PAGES / RESUME_MAX_CHARS.
+MAX_PDF_PAGES = 10
+MAX_RESUME_CHARS = 20000
+
+def count_pdf_pages(pdf):
+    # Page count from the document catalog, without building any Page objects
+    try:
+        return int(resolve1(resolve1(pdf.doc.catalog['Pages'])['Count']))
+    except Exception:
+        return None
+
+def lazy_pdf_pages(pdf):
+    # pdf.pages would build a Page for every page up front; create them one at a time instead
+    doctop = 0
+    for index, page_obj in enumerate(PDFPage.create_pages(pdf.doc)):
+        page = Page(pdf, page_obj, page_number=index + 1, initial_doctop=doctop)
+        doctop += page.height
+        yield page
+
+def iter_pdf_pages(file, max_pages=MAX_PDF_PAGES, max_chars=MAX_RESUME_CHARS, stats=None):
+    # Yield the text of one page at a time, releasing each page's layout objects after use
+    if stats is None:
+        stats = {}
+    stats.update(pages_total=0, pages_read=0, chars=0, truncated=False)
+    with pdfplumber.open(file) as pdf:
+        stats['pages_total'] = count_pdf_pages(pdf)
+        for page_number, page in enumerate(lazy_pdf_pages(pdf)):
+            if max_pages is not None and page_number >= max_pages:
+                stats['truncated'] = True
+                break
+            try:
+                page_text = page.extract_text() or ""
+            finally:
+                # pdfplumber caches chars/objects on the page until it is closed
+                if hasattr(page, 'close'):
+                    page.close()
+                elif hasattr(page, 'flush_cache'):
+                    page.flush_cache()
+            stats['pages_read'] += 1
+            if max_chars is not None and stats['chars'] + len(page_text) > max_chars:
+                page_text = page_text[:max_chars - stats['chars']]
+                stats['truncated'] = True
+            stats['chars'] += len(page_text)
+            if page_text:
+                yield page_text
+            if stats['truncated']:
+                break
+
+def extract_text_with_stats(file, max_pages=MAX_PDF_PAGES, max_chars=MAX_RESUME_CHARS):
+    started = time.perf_counter()
+    stats = {'file': file.filename, 'pages_total': 0, 'pages_read': 0, 'chars': 0, 'truncated': False}
     filename = file.filename.lower()
+    text = ""
     
     if filename.endswith(".pdf"):
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                if page.extract_text():
-                    text += page.extract_text() + " "
+        text = " ".join(iter_pdf_pages(file, max_pages, max_chars, stats))
     elif filename.endswith(".docx"):
         # docx2txt only works with file paths, so save temporarily in memory
         temp_path = f"temp_{file.filename}"
@@ -18,6 +71,16 @@ def extract_text(file):
         text = docx2txt.process(temp_path)
         import os
         os.remove(temp_path)
+        if max_chars is not None and len(text) > max_chars:
+            text = text[:max_chars]
+            stats['truncated'] = True
+        stats['chars'] = len(text)
+    
+    stats['seconds'] = round(time.perf_counter() - started, 4)
+    return text, stats
+
+def extract_text(file, max_pages=MAX_PDF_PAGES, max_chars=MAX_RESUME_CHARS):
+    text, _ = extract_text_with_stats(file, max_pages, max_chars)
     return text
 
 def calculate_score(job_desc, resume_text):
@@ -26,12 +89,23 @@ def calculate_score(job_desc, resume_text):
     score = len(job_keywords & resume_words) / (len(job_keywords) + 1e-5) * 100
     return round(score, 2)
 
-def screen_resumes_from_list(job_desc, resume_files):
+def screen_resumes_from_list(job_desc, resume_files, duplicate_threshold=DUPLICATE_THRESHOLD,
+                             max_pages=MAX_PDF_PAGES, max_chars=MAX_RESUME_CHARS):
     all_scores = []
+    # Near-duplicate copies of an already scored resume reuse its score instead
+    lsh = MinHashLSH(threshold=duplicate_threshold)
     for f in resume_files:
-        text = extract_text(f)
+        text, stats = extract_text_with_stats(f, max_pages, max_chars)
+        signature = minhash_signature(text)
+        match = lsh.query(signature) if signature else None
+        if match:
+            original = all_scores[match[0]]
+            original["duplicates"].append({"file": f.filename, "similarity": round(match[1], 2)})
+            continue
         score = calculate_score(job_desc, text)
-        all_scores.append({"file": f.filename, "score": score})
+        if signature:
+            lsh.add(len(all_scores), signature)
+        all_scores.append({"file": f.filename, "score": score, "stats": stats, "duplicates": []})
     all_scores.sort(key=lambda x: x['score'], reverse=True)
     best_resume = all_scores[0] if all_scores else None
     return best_resume, all_scores
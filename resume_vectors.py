@@ -0,0 +1,240 @@
+import json
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from job_recommender import TOKEN_RE, STOP_WORDS
+
+# Width of the hashed term vectors (stored as float16 on disk)
+DIM = 1024
+# Up to this many resumes a query is an exact scan of the memmap; above it the IVF lists are used
+EXACT_SCAN_LIMIT = 20000
+# Rows scored per block during scans and k-means, to keep temporary arrays small
+BLOCK_ROWS = 8192
+# IVF probing: visit the closest lists until this many candidates per wanted result are collected
+CANDIDATE_FACTOR = 25
+# ...and never fewer than this fraction of all lists
+MIN_PROBE_FRACTION = 0.05
+# k-means training on a sample of the stored vectors; retrained whenever the corpus doubles
+TRAIN_SAMPLE = 20000
+TRAIN_ITERATIONS = 8
+MAX_LISTS = 1024
+INITIAL_CAPACITY = 1024
+
+
+def hashed_vector(text):
+    # Feature hashing: each term adds +/-log(1 + tf) to one of DIM slots, then L2 normalize
+    vector = np.zeros(DIM, dtype=np.float32)
+    counts = Counter(token.rstrip(".") for token in TOKEN_RE.findall((text or "").lower()))
+    for term, count in counts.items():
+        if len(term) < 2 or term in STOP_WORDS:
+            continue
+        h = zlib.crc32(term.encode('utf-8'))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % DIM] += sign * math.log1p(count)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def train_centroids(sample, nlist, iterations=TRAIN_ITERATIONS, seed=7):
+    # Spherical k-means: centroids are unit vectors, rows go to the centroid with the largest dot product
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class ResumeVectorIndex:
+    """Memory-mapped store of resume vectors with an IVF (inverted file) index.
+
+    Small corpora are scanned exactly. Once the corpus outgrows EXACT_SCAN_LIMIT,
+    vectors are grouped under k-means centroids and a query only scores the
+    lists whose centroids are closest to it.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.training = False
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        meta_path = self._path('meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        self.count = meta.get('count', 0)
+        self.capacity = meta.get('capacity', INITIAL_CAPACITY)
+        self.trained_count = meta.get('trained_count', 0)
+        centroids_path = self._path('centroids.npy')
+        self.centroids = np.load(centroids_path) if self.trained_count and os.path.exists(centroids_path) else None
+        self._open_arrays()
+        self.list_order = None  # rows sorted by list id, rebuilt lazily after changes
+        self.row_of = None  # resume id -> row, built lazily for remove()
+
+    def _open_arrays(self):
+        self.vectors = self._open('vectors.f16', np.float16, (self.capacity, DIM))
+        self.ids = self._open('ids.i64', np.int64, (self.capacity,))
+        self.owners = self._open('owners.i64', np.int64, (self.capacity,))
+        self.lists = self._open('lists.i32', np.int32, (self.capacity,))
+        self.alive = self._open('alive.u8', np.uint8, (self.capacity,))
+
+    def _arrays(self):
+        return (self.vectors, self.ids, self.owners, self.lists, self.alive)
+
+    def _open(self, name, dtype, shape):
+        path = self._path(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+
+    def _flush(self):
+        for array in self._arrays():
+            array.flush()
+        tmp_path = self._path('meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'count': self.count, 'capacity': self.capacity, 'dim': DIM,
+                       'trained_count': self.trained_count}, f)
+        os.replace(tmp_path, self._path('meta.json'))
+
+    def _nearest_list(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=-1).astype(np.int32)
+
+    def add(self, resume_id, owner_id, text):
+        """Store the resume `resume_id` belonging to candidate `owner_id`."""
+        vector = hashed_vector(text)
+        with self.lock:
+            if self.count == self.capacity:
+                for array in self._arrays():
+                    array.flush()
+                self.capacity *= 2
+                self._open_arrays()
+            row = self.count
+            self.vectors[row] = vector
+            self.ids[row] = resume_id
+            self.owners[row] = owner_id
+            self.lists[row] = self._nearest_list(vector) if self.centroids is not None else -1
+            self.alive[row] = 1
+            self.count += 1
+            if self.row_of is not None:
+                self.row_of[resume_id] = row
+            self.list_order = None
+            self._flush()
+            retrain = (not self.training and self.count > EXACT_SCAN_LIMIT
+                       and self.count >= 2 * max(self.trained_count, EXACT_SCAN_LIMIT // 2))
+            if retrain:
+                self.training = True
+        if retrain:
+            # k-means takes seconds on a large corpus, so keep it off the request path
+            threading.Thread(target=self.train, daemon=True).start()
+
+    def remove(self, resume_ids):
+        """Hide resumes (e.g. archived or deleted applications) from future searches."""
+        with self.lock:
+            if self.row_of is None:
+                self.row_of = {int(resume_id): row for row, resume_id in enumerate(self.ids[:self.count])}
+            for resume_id in resume_ids:
+                row = self.row_of.pop(int(resume_id), None)
+                if row is not None:
+                    self.alive[row] = 0
+            self.alive.flush()
+
+    def train(self):
+        try:
+            with self.lock:
+                snapshot = self.count
+            rng = np.random.default_rng(snapshot)
+            sample_rows = np.sort(rng.choice(snapshot, min(snapshot, TRAIN_SAMPLE), replace=False))
+            sample = self.vectors[sample_rows].astype(np.float32)
+            nlist = int(min(MAX_LISTS, max(16, 4 * math.sqrt(snapshot)), len(sample)))
+            centroids = train_centroids(sample, nlist)
+            assignments = np.empty(snapshot, dtype=np.int32)
+            for start in range(0, snapshot, BLOCK_ROWS):
+                block = self.vectors[start:min(start + BLOCK_ROWS, snapshot)]
+                assignments[start:start + len(block)] = np.argmax(block.astype(np.float32) @ centroids.T, axis=1)
+            with self.lock:
+                # Rows added while training get assigned with the new centroids too
+                self.centroids = centroids
+                self.lists[:snapshot] = assignments
+                if self.count > snapshot:
+                    tail = self.vectors[snapshot:self.count].astype(np.float32)
+                    self.lists[snapshot:self.count] = self._nearest_list(tail)
+                self.trained_count = snapshot
+                np.save(self._path('centroids.npy'), centroids)
+                self.list_order = None
+                self._flush()
+        finally:
+            self.training = False
+
+    def _candidate_rows(self, query, wanted):
+        if self.list_order is None:
+            self.list_order = np.argsort(self.lists[:self.count], kind='stable')
+            self.sorted_lists = self.lists[:self.count][self.list_order]
+        # Unassigned rows (-1) sort first and are always scored
+        unassigned = np.searchsorted(self.sorted_lists, 0, side='left')
+        chunks = [self.list_order[:unassigned]]
+        found = unassigned
+        min_probe = max(1, int(math.ceil(len(self.centroids) * MIN_PROBE_FRACTION)))
+        for probed, list_id in enumerate(np.argsort(-(self.centroids @ query))):
+            if probed >= min_probe and found >= wanted:
+                break
+            start = np.searchsorted(self.sorted_lists, list_id, side='left')
+            end = np.searchsorted(self.sorted_lists, list_id, side='right')
+            chunks.append(self.list_order[start:end])
+            found += end - start
+        return np.sort(np.concatenate(chunks))
+
+    def _score(self, query, rows):
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = rows[start:start + BLOCK_ROWS]
+            scores[start:start + len(block)] = self.vectors[block].astype(np.float32) @ query
+        return scores
+
+    def search(self, text, k=200, exact=False):
+        """Return up to k (resume_id, owner_id, cosine similarity), best first, one per owner."""
+        query = hashed_vector(text)
+        if not query.any():
+            return []
+        with self.lock:
+            if not self.count:
+                return []
+            if exact or self.centroids is None or self.count <= EXACT_SCAN_LIMIT:
+                rows = np.arange(self.count)
+            else:
+                rows = self._candidate_rows(query, k * CANDIDATE_FACTOR)
+            rows = rows[self.alive[rows].astype(bool)]
+            scores = self._score(query, rows)
+            ids = self.ids[rows]
+            owners = self.owners[rows]
+        # Best first, then keep only each candidate's best resume
+        order = np.argsort(-scores, kind='stable')
+        _, first = np.unique(owners[order], return_index=True)
+        best = order[np.sort(first)][:k]
+        return [(int(ids[i]), int(owners[i]), round(float(scores[i]), 4)) for i in best]
@@ -0,0 +1,84 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+import resume_vectors
+from resume_vectors import ResumeVectorIndex
+
+GENERAL = [f"general{i}" for i in range(3000)]
+TOPICS = [[f"topic{t}skill{i}" for i in range(60)] for t in range(40)]
+
+
+def make_resume(rng):
+    first, second = rng.sample(range(len(TOPICS)), 2)
+    words = rng.choices(TOPICS[first], k=40) + rng.choices(TOPICS[second], k=20) + rng.choices(GENERAL, k=80)
+    return " ".join(words)
+
+
+def make_job(rng):
+    return " ".join(rng.choices(TOPICS[rng.randrange(len(TOPICS))], k=25) + rng.choices(GENERAL, k=25))
+
+
+def brute_force_top(index, text, k):
+    query = resume_vectors.hashed_vector(text)
+    scores = index.vectors[:index.count].astype(np.float32) @ query
+    return {int(index.ids[row]) for row in np.argsort(-scores)[:k]}
+
+
+@pytest.fixture
+def corpus_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_vectors, 'EXACT_SCAN_LIMIT', 1000)
+    rng = random.Random(3)
+    index = ResumeVectorIndex(str(tmp_path / 'index'))
+    for resume_id in range(6000):
+        index.add(resume_id, resume_id, make_resume(rng))
+    while index.training:
+        time.sleep(0.05)
+    index.train()
+    return index
+
+
+def test_ivf_recall_against_brute_force(corpus_index):
+    rng = random.Random(11)
+    recalls = []
+    for _ in range(15):
+        job = make_job(rng)
+        found = {resume_id for resume_id, _, _ in corpus_index.search(job, k=200)}
+        recalls.append(len(found & brute_force_top(corpus_index, job, 200)) / 200)
+    assert corpus_index.centroids is not None
+    assert np.mean(recalls) >= 0.9
+
+
+def test_small_corpus_is_exact(tmp_path):
+    rng = random.Random(5)
+    index = ResumeVectorIndex(str(tmp_path / 'index'))
+    for resume_id in range(300):
+        index.add(resume_id, resume_id, make_resume(rng))
+    job = make_job(rng)
+    results = index.search(job, k=200)
+    assert len(results) == 200
+    assert {resume_id for resume_id, _, _ in results} == brute_force_top(index, job, 200)
+
+
+def test_one_result_per_candidate_and_removed_resumes_skipped(tmp_path):
+    index = ResumeVectorIndex(str(tmp_path / 'index'))
+    text = "python django postgres docker kubernetes"
+    for resume_id in range(30):
+        index.add(resume_id, 7, text)
+    index.add(100, 8, text + " react")
+    index.add(101, 9, "python django")
+    index.remove([101])
+
+    results = index.search(text, k=10)
+    assert [owner for _, owner, _ in results] == [7, 8]
+
+
+def test_index_reloads_from_disk(tmp_path):
+    index = ResumeVectorIndex(str(tmp_path / 'index'))
+    index.add(1, 1, "python flask sqlalchemy")
+    index.add(2, 2, "photoshop figma illustrator")
+
+    reloaded = ResumeVectorIndex(str(tmp_path / 'index'))
+    assert reloaded.search("flask developer", k=1)[0][0] == 1